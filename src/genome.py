@@ -7,9 +7,30 @@ from abc import (
     abstractmethod
 )
 
+from functools import lru_cache
 from typing import(
-    Generic, TypeVar
+    Generic, Iterable, Iterator, TypeVar
 )
+import random
+
+from interval_tree import IntervalTree
+
+# Nucleotide bytes for the bytearray based genomes
+_DASH = b"-"
+_A = b"A"
+_X = b"x"
+
+
+@lru_cache(maxsize=128)
+def _fill(c: bytes, n: int) -> bytes:
+    """
+    Get a run of n copies of the nucleotide byte c.
+
+    TEs are often inserted and copied with the same lengths, so the runs
+    are cached rather than built for every insertion. Bytes are immutable,
+    and slice assignment copies them into the genome, so sharing is safe.
+    """
+    return c * n
 
 
 class Genome(ABC):
@@ -93,14 +114,17 @@ class ListGenome(Genome):
     """
     Representation of a genome.
 
-    Implements the Genome interface using Python's built-in lists
+    Implements the Genome interface using Python's built-in lists,
+    specialised to a bytearray with one byte per nucleotide so an
+    insertion is a single memmove rather than a rebuild of the list.
     """
 
     def __init__(self, n: int):
         """Create a new genome with length n."""
-        self.genome = n * ["-"]
-        self.te_identities = {}
+        self.genome = bytearray(_DASH * n)
+        self.te_identities = IntervalTree()
         self.te_count = 0
+        self._str_cache: str | None = None # Invalidated on mutation
 
 
     def insert_te(self, pos: int, length: int) -> int:
@@ -116,26 +140,31 @@ class ListGenome(Genome):
 
         Returns a new ID for the transposable element.
         """
-
         pos = pos % len(self.genome) # Circularize genome
+        return self._insert_te_unchecked(pos, length)
+
 
-        active_tes = list(self.te_identities.items())
-        for id, te_range in active_tes:
-            start, end = te_range
+    def _insert_te_unchecked(self, pos: int, length: int) -> int:
+        """Insert a new TE at a position already inside the genome."""
+        self._str_cache = None
 
-            if start <= pos < end:
-                self.genome[start:end] = (end - start) * ["x"]
-                self.te_identities.pop(id)
-                continue
+        hit = self.te_identities.stab(pos)
+        if hit is not None:
+            start, end = self.te_identities.pop(hit)
+        else:
+            start = end = pos
 
-            if start > pos:
-                # Define new range for TEs that are positioned later
-                # in the genome than the newly inserted one
-                self.te_identities[id] = (start + length, end + length)
+        # Define new range for TEs that are positioned later
+        # in the genome than the newly inserted one
+        self.te_identities.shift_after(pos, length)
 
         self.te_count += 1
-        self.te_identities[self.te_count] = (pos, pos + length)
-        self.genome = self.genome[:pos] + length * ["A"] + self.genome[pos:]
+        self.te_identities.insert(pos, pos + length, self.te_count)
+
+        # Write the disabled TE we hit (if any) around the new TE, so
+        # the genome is spliced only once
+        self.genome[start:end] = \
+            _fill(_X, pos - start) + _fill(_A, length) + _fill(_X, end - pos)
 
         return self.te_count
 
@@ -154,15 +183,13 @@ class ListGenome(Genome):
 
         If te is not active, return None (and do not copy it).
         """
-        if self.te_identities[te]:
-
-            te_range = self.te_identities[te] # Get positions for TE
-            start, end = te_range
-
-            copy_length = end - start # Length of copy
-            copy_pos = start + offset # Position of copy
+        te_range = self.te_identities.get(te)
+        if te_range is None:
+            return None
 
-        return self.insert_te(copy_pos, copy_length)
+        start, end = te_range
+        copy_pos = (start + offset) % len(self) # Wrap around the genome
+        return self._insert_te_unchecked(copy_pos, end - start)
 
 
 
@@ -174,12 +201,13 @@ class ListGenome(Genome):
         TEs are already inactive, so there is no need to do anything
         for those.
         """
-        if self.te_identities[te]:
+        te_range = self.te_identities.pop(te, None)
+        if te_range is None:
+            return
 
-            te_range = self.te_identities.pop(te)
-            start, end = te_range
-
-            self.genome[start:end] = (end - start) * ['x']
+        self._str_cache = None
+        start, end = te_range
+        self.genome[start:end] = _fill(_X, end - start)
 
 
     def active_tes(self) -> list[int]:
@@ -202,7 +230,9 @@ class ListGenome(Genome):
         represented with the character '-', active TEs with 'A', and disabled
         TEs with 'x'.
         """
-        return "".join(self.genome)
+        if self._str_cache is None:
+            self._str_cache = self.genome.decode("ascii")
+        return self._str_cache
 
 
 
@@ -210,6 +240,7 @@ T = TypeVar('T')
 
 class Link(Generic[T]):
     """Doubly linked link."""
+    __slots__ = ('val', 'prev', 'next')
     val: T
     prev: Link[T]
     next: Link[T]
@@ -221,11 +252,12 @@ class Link(Generic[T]):
         self.next = n
 
 
-def insert_after(link: Link[T], val: T) -> None:
-    """Add new link containing val after link."""
+def insert_after(link: Link[T], val: T) -> Link[T]:
+    """Add new link containing val after link and return the new link."""
     new_link = Link(val, link, link.next)
     new_link.prev.next = new_link
     new_link.next.prev = new_link
+    return new_link
 
 
 def remove_link(link: Link[T]) -> None:
@@ -233,29 +265,186 @@ def remove_link(link: Link[T]) -> None:
     link.prev.next = link.next
     link.next.prev = link.prev
 
-class LinkedListGenome(Genome):
+
+class SkipLink(Generic[T]):
     """
-    Representation of a genome.
+    Express link in an indexable skip list.
 
-    Implements the Genome interface using linked lists.
+    The skip link sits above link and points to the next skip link on
+    the same level. width is the number of links on the bottom level
+    between link and the link under next (or the end of the list if
+    there is no next).
     """
+    __slots__ = ('link', 'down', 'next', 'width')
+    link: Link[T]
+    down: SkipLink[T] | None
+    next: SkipLink[T] | None
+    width: int
+
+    def __init__(self, link: Link[T], down: SkipLink[T] | None,
+                 n: SkipLink[T] | None, width: int):
+        """Create new skip link above link."""
+        self.link = link
+        self.down = down
+        self.next = n
+        self.width = width
 
-    head = Link[T]
 
+class IndexableSkipList(Generic[T]):
+    """
+    Doubly linked list with an index for finding links by position.
 
-    def __init__(self, n: int):
-        """Create a new genome with length n."""
-        self.head = Link(None, None, None)
+    The bottom level is an ordinary circular doubly linked list with a
+    sentinel head. Above it are lanes of skip links; each link is
+    promoted to the next lane with probability 1/4, and the skip links
+    remember how many links they jump over, so a position is found in
+    expected O(log n) steps instead of walking the list from the head.
+    """
+
+    MAX_LANES = 16
+
+    def __init__(self, vals: Iterable[T] = ()) -> None:
+        """Create a list holding vals."""
+        self.head: Link[T] = Link(None, None, None)  # type: ignore
         self.head.next = self.head
         self.head.prev = self.head
+        self.length = 0
+        # Header skip link for each lane, sitting above the head
+        self.lanes: list[SkipLink[T]] = []
+        self._rand = random.Random()
+        self._build(vals)
 
-        self.length = n
+    def _build(self, vals: Iterable[T]) -> None:
+        """
+        Fill an empty list with vals.
 
-        self.te_identities = {}
-        self.te_count = 0
+        Rather than splicing in one link at a time, create all the links
+        up front and wire up their neighbours, then build each lane from
+        the one below it.
+        """
+        links = [Link(val, None, None) for val in vals]  # type: ignore
+        if not links:
+            return
+        ring = [self.head] + links
+        for a, b in zip(ring, ring[1:] + ring[:1]):
+            a.next = b
+            b.prev = a
+        self.length = len(links)
+
+        getrandbits = self._rand.getrandbits
+        below: list[tuple[int, SkipLink[T] | None]] = \
+            [(pos, None) for pos in range(len(links))]
+        while len(self.lanes) < self.MAX_LANES:
+            promoted = [(pos, SkipLink(links[pos], down, None, 0))
+                        for pos, down in below if getrandbits(2) == 3]
+            if not promoted:
+                break
+            lane = SkipLink(self.head,
+                            self.lanes[-1] if self.lanes else None, None, 0)
+            prev, prev_pos = lane, -1
+            for pos, node in promoted:
+                prev.next = node
+                prev.width = pos - prev_pos
+                prev, prev_pos = node, pos
+            prev.width = self.length - prev_pos
+            self.lanes.append(lane)
+            below = promoted  # type: ignore
+
+    def _height(self) -> int:
+        """Pick the number of lanes a new link is promoted to."""
+        bits = self._rand.getrandbits(2 * self.MAX_LANES)
+        height = 0
+        while bits & 3 == 3:
+            height += 1
+            bits >>= 2
+        return height
+
+    def _find(self, pos: int) -> tuple[Link[T], list[list]]:
+        """
+        Find the link at position pos.
+
+        Position -1 is the head. Returns the link together with, for each
+        lane, the last skip link at or before pos and its position.
+        """
+        path: list[list] = [[]] * len(self.lanes)
+        rank = -1
+        link = self.head
+        if self.lanes:
+            node: SkipLink[T] | None = self.lanes[-1]
+            for level in reversed(range(len(self.lanes))):
+                assert node is not None
+                while node.next is not None and rank + node.width <= pos:
+                    rank += node.width
+                    node = node.next
+                path[level] = [node, rank]
+                link = node.link
+                node = node.down
+        for _ in range(pos - rank):
+            link = link.next
+        return link, path
+
+    def splice_insert(self, pos: int, vals: list[T]) -> Link[T]:
+        """
+        Insert vals so the first of them ends up at position pos.
+
+        Returns the link now at position pos.
+        """
+        link, path = self._find(pos - 1)
+        before = link
+        length = self.length
+        for rank, val in enumerate(vals, pos):
+            link = insert_after(link, val)
+            length += 1
+            height = self._height()
+            down = None
+            for level in range(height):
+                if level == len(self.lanes):
+                    lane = SkipLink(self.head,
+                                    self.lanes[-1] if self.lanes else None,
+                                    None, length)
+                    self.lanes.append(lane)
+                    path.append([lane, -1])
+                pred, pred_rank = path[level]
+                down = SkipLink(link, down, pred.next,
+                                pred_rank + pred.width + 1 - rank)
+                pred.width = rank - pred_rank
+                pred.next = down
+                path[level] = [down, rank]
+            for level in range(height, len(self.lanes)):
+                path[level][0].width += 1
+        self.length = length
+        return before.next
+
+    def __len__(self) -> int:
+        """Get the number of links in the list."""
+        return self.length
 
-        for _ in range(n):
-            insert_after(self.head.prev, "-")
+    def __iter__(self) -> Iterator[T]:
+        """Iterate over the values in the list."""
+        link = self.head.next
+        while link is not self.head:
+            yield link.val
+            link = link.next
+
+
+class LinkedListGenome(Genome):
+    """
+    Representation of a genome.
+
+    Implements the Genome interface using linked lists, indexed with
+    a skip list so positions can be found without walking from the head.
+    """
+
+    def __init__(self, n: int):
+        """Create a new genome with length n."""
+        self.genome: IndexableSkipList[str] = IndexableSkipList(n * ["-"])
+
+        self.te_identities = IntervalTree()
+        # The first link of each active TE. Links are never removed, so
+        # unlike positions these stay valid when the genome grows.
+        self.te_links: dict[int, Link[str]] = {}
+        self.te_count = 0
+        self._str_cache: str | None = None # Invalidated on mutation
 
 
     def insert_te(self, pos: int, length: int) -> int:
@@ -271,32 +460,28 @@ class LinkedListGenome(Genome):
 
         Returns a new ID for the transposable element.
         """
+        pos = pos % len(self.genome) # Circularize genome
+        return self._insert_te_unchecked(pos, length)
 
-        active_tes = list(self.te_identities.items())
-        for id, te_range in active_tes:
-            start, end = te_range
 
-            if start <= pos < end:
-                self.disable_te(id)
-                continue
+    def _insert_te_unchecked(self, pos: int, length: int) -> int:
+        """Insert a new TE at a position already inside the genome."""
+        self._str_cache = None
 
-            if start > pos:
-                # Define new range for TEs that are positioned later
-                # in the genome than the newly inserted one
-                self.te_identities[id] = (start + length, end + length)
+        hit = self.te_identities.stab(pos)
+        if hit is not None:
+            self.disable_te(hit)
+
+        # Define new range for TEs that are positioned later
+        # in the genome than the newly inserted one
+        self.te_identities.shift_after(pos, length)
 
         self.te_count += 1
-        self.te_identities[self.te_count] = (pos, pos + length)
+        self.te_identities.insert(pos, pos + length, self.te_count)
 
         # Insert new TE
-        current_link = self.head.next
-        for _ in range(pos - 1): # Go to pos
-            current_link = current_link.next
-        for _ in range(length):
-            insert_after(current_link, 'A')
-            current_link = current_link.next
-
-        self.length = self.length + length # New genome length
+        self.te_links[self.te_count] = \
+            self.genome.splice_insert(pos, length * ['A'])
 
         return self.te_count
 
@@ -315,23 +500,181 @@ class LinkedListGenome(Genome):
 
         If te is not active, return None (and do not copy it).
         """
-        if self.te_identities[te]:
+        te_range = self.te_identities.get(te)
+        if te_range is None:
+            return None
+
+        start, end = te_range
+        copy_pos = (start + offset) % len(self) # Wrap around the genome
+        return self._insert_te_unchecked(copy_pos, end - start)
+
+
+    def disable_te(self, te: int) -> None:
+        """
+        Disable a TE.
 
-            te_range = self.te_identities[te]
-            start, end = te_range
+        If te is an active TE, then make it inactive. Inactive
+        TEs are already inactive, so there is no need to do anything
+        for those.
+        """
+        te_range = self.te_identities.pop(te, None)
+        if te_range is None:
+            return
 
-            copy_length = end - start
-            copy_pos = start + offset
+        self._str_cache = None
+        start, end = te_range
+        link = self.te_links.pop(te)
+        for _ in range(end - start):
+            link.val = 'x'
+            link = link.next
 
-            if offset > 0:
-                return self.insert_te(copy_pos, copy_length)
 
-            if (start + offset) < 0:
-                copy_pos = self.length + start + offset
-                return self.insert_te(copy_pos, copy_length)
+    def active_tes(self) -> list[int]:
+        """Get the active TE IDs."""
+        return list(self.te_identities.keys())
 
-            copy_pos = start + offset
-            return self.insert_te(copy_pos, copy_length)
+    def __len__(self) -> int:
+        """Current length of the genome."""
+        return len(self.genome)
+
+    def __str__(self) -> str:
+        """
+        Return a string representation of the genome.
+
+        Create a string that represents the genome. By nature, it will be
+        linear, but imagine that the last character is immediately followed
+        by the first.
+
+        The genome should start at position 0. Locations with no TE should be
+        represented with the character '-', active TEs with 'A', and disabled
+        TEs with 'x'.
+        """
+        if self._str_cache is None:
+            self._str_cache = "".join(self.genome)
+        return self._str_cache
+
+
+
+class GapBufferGenome(Genome):
+    """
+    Representation of a genome.
+
+    Implements the Genome interface using a gap buffer: a bytearray with
+    one byte per nucleotide and a run of unused bytes, the gap, at the
+    last place we inserted. Inserting at the gap only writes the new
+    nucleotides; inserting elsewhere first moves the gap there, which
+    moves the nucleotides between the two places instead of the whole
+    tail of the genome.
+    """
+
+    def __init__(self, n: int):
+        """Create a new genome with length n."""
+        capacity = max(2 * n, 16)
+        self.buf = bytearray(capacity)
+        self.buf[:n] = _DASH * n
+        self.gap_start, self.gap_end = n, capacity
+
+        self.te_identities = IntervalTree()
+        self.te_count = 0
+        self._str_cache: str | None = None # Invalidated on mutation
+
+
+    def _move_gap(self, pos: int) -> None:
+        """Move the gap so it starts at position pos."""
+        if pos < self.gap_start:
+            # Move the nucleotides in [pos, gap_start) behind the gap
+            moved = self.gap_start - pos
+            self.buf[self.gap_end - moved:self.gap_end] = \
+                self.buf[pos:self.gap_start]
+            self.gap_start -= moved
+            self.gap_end -= moved
+        elif pos > self.gap_start:
+            # Move the nucleotides after the gap in front of it
+            moved = pos - self.gap_start
+            self.buf[self.gap_start:pos] = \
+                self.buf[self.gap_end:self.gap_end + moved]
+            self.gap_start += moved
+            self.gap_end += moved
+
+
+    def _fill_range(self, start: int, end: int, c: bytes) -> None:
+        """Set positions start to end (exclusive) to the character c."""
+        gap_start, gap_len = self.gap_start, self.gap_end - self.gap_start
+        if end <= gap_start:
+            self.buf[start:end] = _fill(c, end - start)
+        elif start >= gap_start:
+            self.buf[start + gap_len:end + gap_len] = _fill(c, end - start)
+        else:
+            self.buf[start:gap_start] = _fill(c, gap_start - start)
+            self.buf[self.gap_end:end + gap_len] = _fill(c, end - gap_start)
+
+
+    def insert_te(self, pos: int, length: int) -> int:
+        """
+        Insert a new transposable element.
+
+        Insert a new transposable element at position pos and len
+        nucleotide forward.
+
+        If the TE collides with an existing TE, i.e. genome[pos]
+        already contains TEs, then that TE should be disabled and
+        removed from the set of active TEs.
+
+        Returns a new ID for the transposable element.
+        """
+        pos = pos % len(self) # Circularize genome
+        return self._insert_te_unchecked(pos, length)
+
+
+    def _insert_te_unchecked(self, pos: int, length: int) -> int:
+        """Insert a new TE at a position already inside the genome."""
+        self._str_cache = None
+
+        hit = self.te_identities.stab(pos)
+        if hit is not None:
+            start, end = self.te_identities.pop(hit)
+            self._fill_range(start, end, _X)
+
+        # Define new range for TEs that are positioned later
+        # in the genome than the newly inserted one
+        self.te_identities.shift_after(pos, length)
+
+        self.te_count += 1
+        self.te_identities.insert(pos, pos + length, self.te_count)
+
+        if self.gap_end - self.gap_start < length:
+            # Grow the gap to at least double the genome's capacity
+            extra = max(len(self.buf), length)
+            self.buf[self.gap_start:self.gap_start] = bytes(extra)
+            self.gap_end += extra
+        self._move_gap(pos)
+        self.buf[self.gap_start:self.gap_start + length] = _fill(_A, length)
+        self.gap_start += length
+
+        return self.te_count
+
+
+    def copy_te(self, te: int, offset: int) -> int | None:
+        """
+        Copy a transposable element.
+
+        Copy the transposable element te to an offset from its current
+        location.
+
+        The offset can be positive or negative; if positive the te is copied
+        upwards and if negative it is copied downwards. If the offset moves
+        the copy left of index 0 or right of the largest index, it should
+        wrap around, since the genome is circular.
+
+        If te is not active, return None (and do not copy it).
+        """
+        te_range = self.te_identities.get(te)
+        if te_range is None:
+            return None
+
+        start, end = te_range
+        copy_pos = (start + offset) % len(self) # Wrap around the genome
+        return self._insert_te_unchecked(copy_pos, end - start)
 
 
     def disable_te(self, te: int) -> None:
@@ -342,18 +685,13 @@ class LinkedListGenome(Genome):
         TEs are already inactive, so there is no need to do anything
         for those.
         """
-        if self.te_identities[te]:
-
-            te_range = self.te_identities.pop(te)
-            start, end = te_range
+        te_range = self.te_identities.pop(te, None)
+        if te_range is None:
+            return
 
-            current_link = self.head.next
-            for _ in range(start):
-                current_link = current_link.next
-
-            for _ in range(end - start):
-                current_link.val = 'x'
-                current_link = current_link.next
+        self._str_cache = None
+        start, end = te_range
+        self._fill_range(start, end, _X)
 
 
     def active_tes(self) -> list[int]:
@@ -362,7 +700,7 @@ class LinkedListGenome(Genome):
 
     def __len__(self) -> int:
         """Current length of the genome."""
-        return self.length
+        return len(self.buf) - (self.gap_end - self.gap_start)
 
     def __str__(self) -> str:
         """
@@ -376,11 +714,8 @@ class LinkedListGenome(Genome):
         represented with the character '-', active TEs with 'A', and disabled
         TEs with 'x'.
         """
-
-        links = []
-        pos = self.head.next
-        for _ in range(self.length):
-            links.append(pos.val)
-            pos = pos.next
-        return "".join(links)
-
+        if self._str_cache is None:
+            before = self.buf[:self.gap_start]
+            after = self.buf[self.gap_end:]
+            self._str_cache = (before + after).decode("ascii")
+        return self._str_cache
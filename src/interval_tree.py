@@ -0,0 +1,282 @@
+"""An augmented interval tree for tracking transposable elements."""
+from __future__ import annotations
+
+from typing import Any, Iterator, TypeVar, overload
+
+
+class _Node:
+    """
+    A node in the interval tree.
+
+    The node holds a half-open interval [start, end) and the ID it belongs
+    to. max_end is the largest end in the subtree rooted at the node.
+
+    lazy is an offset that still has to be added to every coordinate in
+    the subtree, this node included. It is pushed down to the children
+    whenever we descend through the node, so shifting a whole subtree is
+    a constant time operation.
+    """
+
+    __slots__ = ('start', 'end', 'id', 'max_end', 'lazy',
+                 'height', 'left', 'right', 'parent')
+
+    def __init__(self, start: int, end: int, id: int):
+        """Create a leaf node for the interval [start, end)."""
+        self.start = start
+        self.end = end
+        self.id = id
+        self.max_end = end
+        self.lazy = 0
+        self.height = 1
+        self.left: _Node | None = None
+        self.right: _Node | None = None
+        self.parent: _Node | None = None
+
+
+def _height(node: _Node | None) -> int:
+    """Get the height of a (possibly empty) subtree."""
+    return node.height if node is not None else 0
+
+
+def _push(node: _Node) -> None:
+    """Apply the node's pending offset to it and hand it to its children."""
+    lazy = node.lazy
+    if lazy:
+        node.start += lazy
+        node.end += lazy
+        node.max_end += lazy
+        if node.left is not None:
+            node.left.lazy += lazy
+        if node.right is not None:
+            node.right.lazy += lazy
+        node.lazy = 0
+
+
+def _update(node: _Node) -> None:
+    """Recompute height and max_end of a node that has no pending offset."""
+    left, right = node.left, node.right
+    node.height = 1 + max(_height(left), _height(right))
+    max_end = node.end
+    if left is not None:
+        max_end = max(max_end, left.max_end + left.lazy)
+    if right is not None:
+        max_end = max(max_end, right.max_end + right.lazy)
+    node.max_end = max_end
+
+
+def _rotate_right(y: _Node) -> _Node:
+    """Rotate the subtree rooted at y to the right and return the new root."""
+    x = y.left
+    assert x is not None
+    _push(y)
+    _push(x)
+    y.left = x.right
+    if y.left is not None:
+        y.left.parent = y
+    x.right = y
+    x.parent = y.parent
+    y.parent = x
+    _update(y)
+    _update(x)
+    return x
+
+
+def _rotate_left(x: _Node) -> _Node:
+    """Rotate the subtree rooted at x to the left and return the new root."""
+    y = x.right
+    assert y is not None
+    _push(x)
+    _push(y)
+    x.right = y.left
+    if x.right is not None:
+        x.right.parent = x
+    y.left = x
+    y.parent = x.parent
+    x.parent = y
+    _update(x)
+    _update(y)
+    return y
+
+
+def _rebalance(node: _Node) -> _Node:
+    """Restore the AVL invariant at node and return the subtree's root."""
+    _update(node)
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        assert node.left is not None
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        assert node.right is not None
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+
+_MISSING: Any = object()
+_D = TypeVar('_D')
+
+
+class IntervalTree:
+    """
+    Non-overlapping intervals, each labelled with an ID.
+
+    The intervals are kept in an AVL tree ordered by their start
+    coordinate, with ties (empty intervals can share a start with the
+    interval after them) broken by ID, and every node is augmented with the largest end in its
+    subtree. That gives logarithmic time lookup of the interval covering
+    a position, and with lazy offsets also logarithmic time shifting of
+    all intervals after a position.
+
+    Looked up by ID, the tree behaves like a dict mapping each ID to its
+    (start, end) pair, and iterates over the IDs in the order they were
+    inserted.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty tree."""
+        self._root: _Node | None = None
+        self._nodes: dict[int, _Node] = {}
+
+    def insert(self, start: int, end: int, id: int) -> None:
+        """Add the interval [start, end) with the given ID."""
+        node = _Node(start, end, id)
+        self._nodes[id] = node
+        self._root = self._insert(self._root, node)
+        self._root.parent = None
+
+    def _insert(self, node: _Node | None, new: _Node) -> _Node:
+        """Insert new in the subtree rooted at node and return its root."""
+        if node is None:
+            return new
+        _push(node)
+        if (new.start, new.id) < (node.start, node.id):
+            node.left = self._insert(node.left, new)
+            node.left.parent = node
+        else:
+            node.right = self._insert(node.right, new)
+            node.right.parent = node
+        return _rebalance(node)
+
+    def _delete(self, node: _Node | None,
+                start: int, id: int) -> _Node | None:
+        """Delete the interval (start, id) from the subtree at node."""
+        assert node is not None
+        _push(node)
+        if (start, id) < (node.start, node.id):
+            node.left = self._delete(node.left, start, id)
+            if node.left is not None:
+                node.left.parent = node
+        elif (start, id) > (node.start, node.id):
+            node.right = self._delete(node.right, start, id)
+            if node.right is not None:
+                node.right.parent = node
+        else:
+            if node.left is None or node.right is None:
+                return node.left if node.left is not None else node.right
+
+            # Move the successor's interval into this node and
+            # delete the successor from the right subtree instead.
+            succ = node.right
+            _push(succ)
+            while succ.left is not None:
+                succ = succ.left
+                _push(succ)
+            node.start, node.end, node.id = succ.start, succ.end, succ.id
+            self._nodes[node.id] = node
+            node.right = self._delete(node.right, succ.start, succ.id)
+            if node.right is not None:
+                node.right.parent = node
+        return _rebalance(node)
+
+    def stab(self, pos: int) -> int | None:
+        """Get the ID of the interval containing pos, or None if none does."""
+        node = self._root
+        while node is not None:
+            _push(node)
+            if node.start <= pos < node.end:
+                return node.id
+            left = node.left
+            if left is not None and left.max_end + left.lazy > pos:
+                node = left
+            else:
+                node = node.right
+        return None
+
+    def shift_after(self, pos: int, delta: int) -> None:
+        """Move all intervals that start after pos by delta."""
+        path = []
+        node = self._root
+        while node is not None:
+            _push(node)
+            path.append(node)
+            if node.start > pos:
+                # This node and everything to its right moves
+                node.start += delta
+                node.end += delta
+                if node.right is not None:
+                    node.right.lazy += delta
+                node = node.left
+            else:
+                node = node.right
+        for node in reversed(path):
+            _update(node)
+
+    def __getitem__(self, id: int) -> tuple[int, int]:
+        """Get the (start, end) interval for ID."""
+        node: _Node | None = self._nodes[id]
+        # The pending offsets for the node sit on the path up to the root
+        offset = 0
+        start, end = node.start, node.end
+        while node is not None:
+            offset += node.lazy
+            node = node.parent
+        return start + offset, end + offset
+
+    def get(self, id: int) -> tuple[int, int] | None:
+        """Get the (start, end) interval for ID, or None if it is missing."""
+        if id not in self._nodes:
+            return None
+        return self[id]
+
+    @overload
+    def pop(self, id: int) -> tuple[int, int]: ...
+
+    @overload
+    def pop(self, id: int, default: _D) -> tuple[int, int] | _D: ...
+
+    def pop(self, id: int, default: Any = _MISSING) -> Any:
+        """
+        Remove ID and return its (start, end) interval.
+
+        If ID is not in the tree, return default if it is given and
+        raise KeyError otherwise.
+        """
+        if id not in self._nodes:
+            if default is _MISSING:
+                raise KeyError(id)
+            return default
+        interval = self[id]
+        del self._nodes[id]
+        self._root = self._delete(self._root, interval[0], id)
+        if self._root is not None:
+            self._root.parent = None
+        return interval
+
+    def keys(self) -> Iterator[int]:
+        """Iterate over the IDs in insertion order."""
+        return iter(self._nodes)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the IDs in insertion order."""
+        return iter(self._nodes)
+
+    def __contains__(self, id: object) -> bool:
+        """Check if ID is in the tree."""
+        return id in self._nodes
+
+    def __len__(self) -> int:
+        """Get the number of intervals in the tree."""
+        return len(self._nodes)
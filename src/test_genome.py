@@ -8,7 +8,9 @@
 from genome import (
     Genome,
     ListGenome,
-    LinkedListGenome
+    LinkedListGenome,
+    GapBufferGenome,
+    IndexableSkipList
 )
 from typing import Type
 
@@ -27,6 +29,9 @@ def run_genome_test(genome_class: Type[Genome]) -> None:
     assert str(genome) == "-----xxxxxAAAAAAAAAAxxxxx---------------"
     assert genome.active_tes() == [2]
 
+    assert genome.copy_te(1, 5) is None  # 1 is no longer active
+    assert str(genome) == "-----xxxxxAAAAAAAAAAxxxxx---------------"
+
     # Make TE 3 20 to the right of the start of 2
     assert 3 == genome.copy_te(2, 20)
     assert str(genome) == "-----xxxxxAAAAAAAAAAxxxxx-----AAAAAAAAAA----------"
@@ -50,6 +55,12 @@ def run_genome_test(genome_class: Type[Genome]) -> None:
         "xxxxxxxxxx-----xxxxxAAAAAAAAAAxxxxx-----"
     assert genome.active_tes() == [2, 5]
 
+    genome.disable_te(3)  # Already inactive, so nothing happens
+    assert str(genome) == \
+        "-----xxxxxAAAAAAAAAAxxxxx-----" \
+        "xxxxxxxxxx-----xxxxxAAAAAAAAAAxxxxx-----"
+    assert genome.active_tes() == [2, 5]
+
 
 def test_list_genome() -> None:
     """Test that the Python list implementation works."""
@@ -59,3 +70,19 @@ def test_list_genome() -> None:
 def test_linked_list_genome() -> None:
     """Test that the linked list implementation works."""
     run_genome_test(LinkedListGenome)
+
+
+def test_gap_buffer_genome() -> None:
+    """Test that the gap buffer implementation works."""
+    run_genome_test(GapBufferGenome)
+
+
+def test_indexable_skip_list() -> None:
+    """Test splicing by position in the skip list."""
+    lst: IndexableSkipList[str] = IndexableSkipList()
+    lst.splice_insert(0, 10 * ["-"])
+    lst.splice_insert(3, 4 * ["A"])
+    lst.splice_insert(0, ["A"])
+    lst.splice_insert(len(lst), 2 * ["A"])
+    assert "".join(lst) == "A---AAAA-------AA"
+    assert len(lst) == 17
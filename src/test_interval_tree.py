@@ -0,0 +1,67 @@
+"""Testing the interval tree."""
+
+from interval_tree import IntervalTree
+
+
+def test_stab() -> None:
+    """Test that stabbing finds the interval covering a position."""
+    tree = IntervalTree()
+    tree.insert(10, 20, 1)
+    tree.insert(0, 5, 2)
+    tree.insert(30, 35, 3)
+    assert tree.stab(0) == 2
+    assert tree.stab(4) == 2
+    assert tree.stab(5) is None
+    assert tree.stab(19) == 1
+    assert tree.stab(20) is None
+    assert tree.stab(32) == 3
+    assert tree.stab(100) is None
+
+
+def test_shift_after() -> None:
+    """Test that only intervals starting after pos are moved."""
+    tree = IntervalTree()
+    for id, start in enumerate(range(0, 100, 10)):
+        tree.insert(start, start + 5, id)
+    tree.shift_after(40, 3)
+    assert tree[4] == (40, 45)
+    assert tree[5] == (53, 58)
+    assert tree[9] == (93, 98)
+    assert tree.stab(52) is None
+    assert tree.stab(53) == 5
+
+
+def test_pop() -> None:
+    """Test removing intervals by ID."""
+    tree = IntervalTree()
+    for id, start in enumerate(range(0, 100, 10)):
+        tree.insert(start, start + 5, id)
+    tree.shift_after(25, 1)
+    assert tree.pop(3) == (31, 36)
+    assert tree.pop(3, None) is None
+    assert tree.get(3) is None
+    assert tree.get(4) == (41, 46)
+    assert tree.stab(32) is None
+    assert list(tree) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    for id in [0, 9, 5, 4]:
+        tree.pop(id)
+    assert list(tree) == [1, 2, 6, 7, 8]
+    assert [tree[id] for id in tree] \
+        == [(10, 15), (20, 25), (61, 66), (71, 76), (81, 86)]
+
+
+def test_shared_start() -> None:
+    """Test that an empty interval sharing a start is kept apart."""
+    tree = IntervalTree()
+    tree.insert(3, 3, 1)
+    tree.insert(3, 7, 2)
+    tree.insert(8, 9, 3)
+    assert tree.stab(3) == 2
+    assert tree.pop(2) == (3, 7)
+    assert tree.stab(4) is None
+    assert list(tree) == [1, 3]
+    assert tree[1] == (3, 3)
+    tree.shift_after(2, 5)
+    assert tree.pop(1) == (8, 8)
+    assert tree.pop(3) == (13, 14)
+    assert list(tree) == []